@@ -1,10 +1,41 @@
 import math
+import os
 import warnings
-from datetime import datetime, timedelta, time, timezone
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 
 
 # CONSTANT
 TO_RAD = math.pi/180.0
+FROM_RAD = 180.0/math.pi
+ZENITH = 90.8   # Sun reference zenith used for sunrise and sunset
+COS_ZENITH = math.cos(TO_RAD*ZENITH)
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _cache_size():
+    # Cache size from the environment, a malformed value must not break the import
+    value = os.environ.get('SUNTIME_CACHE_SIZE')
+    if value is None:
+        return DEFAULT_CACHE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        size = -1
+    if size < 0:
+        warnings.warn("Invalid SUNTIME_CACHE_SIZE value {!r}, "
+                      "using the default of {}.".format(value, DEFAULT_CACHE_SIZE), RuntimeWarning)
+        return DEFAULT_CACHE_SIZE
+    return size
+
+
+# Number of cached sunrise/sunset calculations and time zone offsets, set SUNTIME_CACHE_SIZE=0 to disable
+CACHE_SIZE = _cache_size()
+
+# Offsets of recently used time zones by id(time_zone) and the wall clock date and hour. The time zone itself is kept
+# in the value so its id cannot be reused while cached (dateutil time zones are not hashable).
+_utc_offsets = {}
 
 
 class SunTimeException(Exception):
@@ -23,21 +54,26 @@ class Sun:
         self._lon = lon
 
         self.lngHour = self._lon / 15
+        # Latitude dependent terms of the Sun's local hour angle
+        self._sin_lat = math.sin(TO_RAD*self._lat)
+        self._inv_cos_lat = 1 / math.cos(TO_RAD*self._lat)
 
-    def get_sunrise_time(self, at_date=datetime.now(), time_zone=timezone.utc):
+    def get_sunrise_time(self, at_date=None, time_zone=timezone.utc):
         """
         :param at_date: Reference date. datetime.now() if not provided.
         :param time_zone: pytz object with .tzinfo() or None
         :return: sunrise datetime.
         :raises: SunTimeException when there is no sunrise and sunset on given location and date.
         """
-        time_delta = self.get_sun_timedelta(at_date, time_zone=time_zone, is_rise_time=True)
-        if time_delta is None:
+        if at_date is None:
+            at_date = datetime.now()
+        seconds = self._get_sun_seconds(_day_of_year(at_date), _utc_offset(at_date, time_zone), is_rise_time=True)
+        if seconds is None:
             raise SunTimeException('The sun never rises on this location (on the specified date)')
         else:
-            return datetime.combine(at_date, time(tzinfo=time_zone)) + time_delta
+            return _sun_datetime(at_date, seconds, time_zone)
 
-    def get_sunset_time(self, at_date=datetime.now(), time_zone=timezone.utc):
+    def get_sunset_time(self, at_date=None, time_zone=timezone.utc):
         """
         Calculate the sunset time for given date.
         :param at_date: Reference date. datetime.now() if not provided.
@@ -45,26 +81,114 @@ class Sun:
         :return: sunset datetime.
         :raises: SunTimeException when there is no sunrise and sunset on given location and date.
         """
-        time_delta = self.get_sun_timedelta(at_date, time_zone=time_zone, is_rise_time=False)
-        if time_delta is None:
+        if at_date is None:
+            at_date = datetime.now()
+        seconds = self._get_sun_seconds(_day_of_year(at_date), _utc_offset(at_date, time_zone), is_rise_time=False)
+        if seconds is None:
+            raise SunTimeException('The sun never rises on this location (on the specified date)')
+        else:
+            return _sun_datetime(at_date, seconds, time_zone)
+
+    def get_sunrise_sunset_time(self, at_date=None, time_zone=timezone.utc):
+        """
+        Calculate both the sunrise and the sunset time for given date.
+        :param at_date: Reference date. datetime.now() if not provided.
+        :param time_zone: pytz object with .tzinfo() or None
+        :return: tuple of sunrise and sunset datetimes.
+        :raises: SunTimeException when there is no sunrise and sunset on given location and date.
+        """
+        if at_date is None:
+            at_date = datetime.now()
+        # The day of the year and the time zone offset are shared by both calculations
+        N = _day_of_year(at_date)
+        utc_offset = _utc_offset(at_date, time_zone)
+        sunrise_seconds = self._get_sun_seconds(N, utc_offset, is_rise_time=True)
+        sunset_seconds = self._get_sun_seconds(N, utc_offset, is_rise_time=False)
+        if sunrise_seconds is None or sunset_seconds is None:
             raise SunTimeException('The sun never rises on this location (on the specified date)')
         else:
-            return datetime.combine(at_date, time(tzinfo=time_zone)) + time_delta
+            return _sun_datetime(at_date, sunrise_seconds, time_zone), _sun_datetime(at_date, sunset_seconds, time_zone)
+
+    def get_sunrise_times(self, dates, time_zone=timezone.utc):
+        """
+        Calculate the sunrise times for a batch of dates.
+        :param dates: Iterable of reference dates.
+        :param time_zone: pytz object with .tzinfo() or None
+        :return: list of sunrise datetimes, None for the dates on which the sun never rises.
+        """
+        return self._get_sun_times(dates, time_zone, is_rise_time=True)
+
+    def get_sunset_times(self, dates, time_zone=timezone.utc):
+        """
+        Calculate the sunset times for a batch of dates.
+        :param dates: Iterable of reference dates.
+        :param time_zone: pytz object with .tzinfo() or None
+        :return: list of sunset datetimes, None for the dates on which the sun never sets.
+        """
+        return self._get_sun_times(dates, time_zone, is_rise_time=False)
+
+    def _get_sun_times(self, dates, time_zone, is_rise_time):
+        return [None if seconds is None else _sun_datetime(at_date, seconds, time_zone)
+                for at_date, seconds in self._iter_sun_seconds(dates, time_zone, is_rise_time)]
+
+    def get_sun_times_year(self, year, time_zone=timezone.utc):
+        """
+        Calculate the sunrise and sunset times for every day of a year.
+        :param year: Reference year.
+        :param time_zone: pytz object with .tzinfo() or None
+        :return: tuple of lists of sunrise and sunset datetimes, None for the days without sunrise or sunset.
+        """
+        start = _year_start_ordinal(year)
+        days = [datetime.fromordinal(ordinal) for ordinal in range(start, _year_start_ordinal(year + 1))]
+        return self.get_sunrise_times(days, time_zone), self.get_sunset_times(days, time_zone)
 
-    def get_local_sunrise_time(self, at_date=datetime.now(), time_zone=None):
+    def get_sunrise_seconds(self, dates, time_zone=timezone.utc):
+        """
+        Calculate the sunrise times for a batch of dates without building a datetime for each of them.
+        :param dates: Iterable of reference dates.
+        :param time_zone: pytz object with .tzinfo() or None
+        :return: array of seconds from the midnight of each date to sunrise, nan for the dates on which the sun
+        never rises.
+        """
+        return self._get_sun_seconds_array(dates, time_zone, is_rise_time=True)
+
+    def get_sunset_seconds(self, dates, time_zone=timezone.utc):
+        """
+        Calculate the sunset times for a batch of dates without building a datetime for each of them.
+        :param dates: Iterable of reference dates.
+        :param time_zone: pytz object with .tzinfo() or None
+        :return: array of seconds from the midnight of each date to sunset, nan for the dates on which the sun
+        never sets.
+        """
+        return self._get_sun_seconds_array(dates, time_zone, is_rise_time=False)
+
+    def _get_sun_seconds_array(self, dates, time_zone, is_rise_time):
+        # One contiguous array of doubles instead of a datetime object per date
+        return array('d', (math.nan if seconds is None else seconds
+                           for _, seconds in self._iter_sun_seconds(dates, time_zone, is_rise_time)))
+
+    def _iter_sun_seconds(self, dates, time_zone, is_rise_time):
+        # Bind lookups once for the whole batch instead of once per date, same for a fixed time zone offset
+        get_sun_seconds = self._get_sun_seconds
+        fixed_utc_offset = _fixed_utc_offset(time_zone)
+        for at_date in dates:
+            utc_offset = _utc_offset(at_date, time_zone) if fixed_utc_offset is None else fixed_utc_offset
+            yield at_date, get_sun_seconds(_day_of_year(at_date), utc_offset, is_rise_time)
+
+    def get_local_sunrise_time(self, at_date=None, time_zone=None):
         """ DEPRECATED: Use get_sunrise_time() instead. """
         warnings.warn("get_local_sunrise_time is deprecated and will be removed in future versions."
                       "Use get_sunrise_time with proper time zone", DeprecationWarning)
 
         return self.get_sunrise_time(at_date, time_zone)
 
-    def get_local_sunset_time(self, at_date=datetime.now(), time_zone=None):
+    def get_local_sunset_time(self, at_date=None, time_zone=None):
         """ DEPRECATED: Use get_sunset_time() instead. """
         warnings.warn("get_local_sunset_time is deprecated and will be removed in future versions."
                       "Use get_sunset_time with proper time zone.", DeprecationWarning)
         return self.get_sunset_time(at_date, time_zone)
 
-    def get_sun_timedelta(self, at_date, time_zone, is_rise_time=True, zenith=90.8):
+    def get_sun_timedelta(self, at_date, time_zone, is_rise_time=True, zenith=ZENITH):
         """
         Calculate sunrise or sunset date.
         :param at_date: Reference date
@@ -73,81 +197,149 @@ class Sun:
         :param zenith: Sun reference zenith
         :return: timedelta showing hour, minute, and second of sunrise or sunset
         """
+        seconds = self._get_sun_seconds(_day_of_year(at_date), _utc_offset(at_date, time_zone), is_rise_time, zenith)
+        if seconds is None:
+            return None
+        # 8. return timedelta
+        return timedelta(seconds=seconds)
 
-        # If not set get local timezone from datetime
-        if time_zone is None:
-            time_zone = datetime.now().tzinfo
-
-        # 1. first get the day of the year
-        N = at_date.timetuple().tm_yday
-
-        # 2. convert the longitude to hour value and calculate an approximate time
-        if is_rise_time:
-            t = N + ((6 - self.lngHour) / 24)
-        else:   # sunset
-            t = N + ((18 - self.lngHour) / 24)
-
-        # 3a. calculate the Sun's mean anomaly
-        M = (0.9856 * t) - 3.289
-
-        # 3b. calculate the Sun's true longitude
-        L = M + (1.916 * math.sin(TO_RAD*M)) + (0.020 * math.sin(TO_RAD * 2 * M)) + 282.634
-        L = self._force_range(L, 360)   # NOTE: L adjusted into the range [0,360)
-
-        # 4a. calculate the Sun's declination
-        sinDec = 0.39782 * math.sin(TO_RAD*L)
-        cosDec = math.cos(math.asin(sinDec))
-
-        # 4b. calculate the Sun's local hour angle
-        cosH = (math.cos(TO_RAD*zenith) - (sinDec * math.sin(TO_RAD*self._lat))) / (cosDec * math.cos(TO_RAD*self._lat))
+    def _get_sun_seconds(self, N, utc_offset, is_rise_time, zenith=ZENITH):
+        # Sunrise or sunset as seconds from the local midnight of the N-th day of the year, None if there is none
+        cos_zenith = COS_ZENITH if zenith == ZENITH else math.cos(TO_RAD*zenith)
+        UT = _sun_ut(self.lngHour, self._sin_lat, self._inv_cos_lat, cos_zenith, N, is_rise_time)
+        if UT is None:
+            return None     # The sun never rises or sets on this location (on the specified date)
 
-        if cosH > 1:
-            return None     # The sun never rises on this location (on the specified date)
-        if cosH < -1:
-            return None     # The sun never sets on this location (on the specified date)
+        # 7b. adjust back to local time
+        UT += utc_offset
 
-        # 4c. finish calculating H and convert into hours
+        # 7c. rounding (to 0.01 hour, i.e. 36 seconds) and impose range bounds
+        seconds = round(UT * 100) * 36
         if is_rise_time:
-            H = 360 - (1/TO_RAD) * math.acos(cosH)
-        else:   # setting
-            H = (1/TO_RAD) * math.acos(cosH)
-        H = H / 15
-
-        # 5a. calculate the Sun's right ascension
-        RA = (1/TO_RAD) * math.atan(0.91764 * math.tan(TO_RAD*L))
-        RA = self._force_range(RA, 360)     # NOTE: RA adjusted into the range [0,360)
-
-        # 5b. right ascension value needs to be in the same quadrant as L
-        Lquadrant = (math.floor(L/90)) * 90
-        RAquadrant = (math.floor(RA/90)) * 90
-        RA = RA + (Lquadrant - RAquadrant)
-
-        # 5c. right ascension value needs to be converted into hours
-        RA = RA / 15
-
-        # 6. calculate local mean time of rising/setting
-        T = H + RA - (0.06571 * t) - 6.622
+            # NOTE: shifted by one day at most, like sunset this keeps the pair within one day of each other
+            if seconds < 0:
+                seconds += 86400
+            elif seconds >= 86400:
+                seconds -= 86400
+        return seconds
 
-        # 7a. adjust back to UTC
-        UT = T - self.lngHour
 
-        if time_zone:
-            # 7b. adjust back to local time
-            UT += time_zone.utcoffset(at_date).total_seconds() / 3600
-
-        # 7c. rounding and impose range bounds
-        UT = round(UT, 2)
-        if is_rise_time:
-            UT = self._force_range(UT, 24)
-
-        # 8. return timedelta
-        return timedelta(hours=UT)
-
-    @staticmethod
-    def _force_range(v, max):
-        # force v to be >= 0 and < max
-        if v < 0:
-            return v + max
-        elif v >= max:
-            return v - max
-        return v
+@lru_cache(maxsize=CACHE_SIZE)
+def _sun_ut(lng_hour, sin_lat, inv_cos_lat, cos_zenith, N, is_rise_time):
+    """
+    Calculate the UTC time of sunrise or sunset in hours. Results are cached by location, zenith and day of the year,
+    so they are shared by all Sun instances.
+    :param lng_hour: Longitude converted to hours.
+    :param sin_lat: Sine of the latitude.
+    :param inv_cos_lat: Reciprocal of the cosine of the latitude.
+    :param cos_zenith: Cosine of the Sun reference zenith.
+    :param N: Day of the year.
+    :param is_rise_time: True if you want to calculate sunrise time.
+    :return: UTC hours or None when the sun never rises or sets on given location and date.
+    """
+    # 2. convert the longitude to hour value and calculate an approximate time
+    if is_rise_time:
+        t = N + ((6 - lng_hour) / 24)
+    else:   # sunset
+        t = N + ((18 - lng_hour) / 24)
+
+    # 3a. calculate the Sun's mean anomaly
+    M = (0.9856 * t) - 3.289
+
+    # 3b. calculate the Sun's true longitude
+    L = M + (1.916 * math.sin(TO_RAD*M)) + (0.020 * math.sin(TO_RAD * 2 * M)) + 282.634
+    L = L % 360   # NOTE: L adjusted into the range [0,360)
+
+    # NOTE: sine and cosine of L are shared by the declination and the right ascension
+    sinL = math.sin(TO_RAD*L)
+    cosL = math.cos(TO_RAD*L)
+
+    # 4a. calculate the Sun's declination
+    sinDec = 0.39782 * sinL
+    cosDec = math.sqrt(1 - sinDec * sinDec)    # NOTE: equals cos(asin(sinDec)) as sinDec is in [-0.4, 0.4]
+
+    # 4b. calculate the Sun's local hour angle
+    cosH = (cos_zenith * inv_cos_lat - (sinDec * (sin_lat * inv_cos_lat))) / cosDec
+
+    if cosH > 1:
+        return None     # The sun never rises on this location (on the specified date)
+    if cosH < -1:
+        return None     # The sun never sets on this location (on the specified date)
+
+    # 4c. finish calculating H and convert into hours
+    if is_rise_time:
+        H = 360 - FROM_RAD * math.acos(cosH)
+    else:   # setting
+        H = FROM_RAD * math.acos(cosH)
+    H = H / 15
+
+    # 5a. calculate the Sun's right ascension (atan2 puts it in the same quadrant as L)
+    RA = FROM_RAD * math.atan2(0.91764 * sinL, cosL)
+    RA = RA % 360     # NOTE: RA adjusted into the range [0,360)
+
+    # 5b. right ascension value needs to be converted into hours
+    RA = RA / 15
+
+    # 6. calculate local mean time of rising/setting
+    T = H + RA - (0.06571 * t) - 6.622
+
+    # 7a. adjust back to UTC
+    UT = T - lng_hour
+
+    return UT
+
+
+def _sun_datetime(at_date, seconds, time_zone):
+    # Build the datetime directly instead of combining the date with midnight and adding a timedelta
+    days, seconds = divmod(seconds, 86400)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    sun_time = datetime(at_date.year, at_date.month, at_date.day, hour, minute, second, tzinfo=time_zone)
+    if days:
+        sun_time += timedelta(days=days)
+    return sun_time
+
+
+def _utc_offset(at_date, time_zone):
+    # Time zone offset in hours
+    # If not set get local timezone from datetime
+    if time_zone is None:
+        time_zone = datetime.now().tzinfo
+    if not time_zone:
+        return 0
+    if isinstance(time_zone, timezone):
+        # Fixed offsets do not depend on the date, which may also be a plain date then
+        at_date = None
+    if at_date is None:
+        key = (id(time_zone), None)
+    else:
+        # utcoffset() reads the wall clock fields, so aware datetimes must not be keyed by their UTC instant. Naive
+        # datetimes ignore fold in comparisons, so it is part of the key.
+        wall_time = at_date.replace(tzinfo=None) if isinstance(at_date, datetime) else at_date
+        key = (id(time_zone), wall_time, getattr(at_date, 'fold', 0))
+    cached = _utc_offsets.get(key)
+    if cached is not None:
+        return cached[1]
+    utc_offset = time_zone.utcoffset(at_date).total_seconds() / 3600
+    if CACHE_SIZE:
+        if len(_utc_offsets) >= CACHE_SIZE:
+            _utc_offsets.clear()
+        _utc_offsets[key] = (time_zone, utc_offset)
+    return utc_offset
+
+
+def _fixed_utc_offset(time_zone):
+    # Time zone offset in hours when it does not depend on the date, None otherwise
+    if time_zone is None or isinstance(time_zone, timezone):
+        return _utc_offset(None, time_zone)
+    return None
+
+
+def _day_of_year(at_date):
+    # Same as at_date.timetuple().tm_yday without building the whole struct_time
+    return at_date.toordinal() - _year_start_ordinal(at_date.year) + 1
+
+
+@lru_cache(maxsize=8)
+def _year_start_ordinal(year):
+    return date(year, 1, 1).toordinal()
@@ -1,8 +1,13 @@
+import math
+import os
+import pickle
 import unittest
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
 from dateutil import tz
 
 from suntime import Sun, SunTimeException
+from suntime.suntime import CACHE_SIZE, DEFAULT_CACHE_SIZE, _cache_size, _sun_ut, _utc_offsets
 
 _SF_LAT = 37.7749
 _SF_LON = -122.4194
@@ -13,6 +18,12 @@ _TOKYO_LON = 139.6917
 _SYDNEY_LAT = -33.8688
 _SYDNEY_LON = 151.2093
 
+_KIRITIMATI_LAT = 1.8721
+_KIRITIMATI_LON = -157.4278
+
+_WARSAW_LAT = 51.21
+_WARSAW_LON = 21.01
+
 _NORTH_POLE_LAT = 90
 _NORTH_POLE_LON = 0
 
@@ -52,6 +63,30 @@ class TestWestSun(unittest.TestCase):
         self.assertEqual(utc_default_sunrise.date(), datetime.now().date())
         self.assertEqual(local_default_sunrise.date(), datetime.now().date())
 
+    def test_pickle(self):
+        # Sun can be passed to other processes (e.g. multiprocessing workers)
+        sun = pickle.loads(pickle.dumps(self.sun))
+        self.assertEqual(sun.get_sunrise_time(datetime(2024, 3, 11)), self.sun.get_sunrise_time(datetime(2024, 3, 11)))
+
+    def test_get_sun_times(self):
+        # Batch results match the single date calculation
+        dates = [datetime(2024, 3, 11), datetime(2024, 6, 20)]
+        self.assertEqual(self.sun.get_sunrise_times(dates), [self.sun.get_sunrise_time(d) for d in dates])
+        self.assertEqual(self.sun.get_sunset_times(dates), [self.sun.get_sunset_time(d) for d in dates])
+        # Every day of a leap year
+        sunrises, sunsets = self.sun.get_sun_times_year(2024)
+        self.assertEqual((len(sunrises), len(sunsets)), (366, 366))
+        self.assertEqual(sunrises[70], self.sun.get_sunrise_time(datetime(2024, 3, 11)))
+        self.assertEqual(sunsets[-1], self.sun.get_sunset_time(datetime(2024, 12, 31)))
+        # Seconds from the midnight of each date
+        self.assertEqual(list(self.sun.get_sunrise_seconds(dates)), [51948, 46080])
+        self.assertEqual(list(self.sun.get_sunset_seconds(dates)), [94428, 12888])
+        # Plain dates work with fixed offset time zones, as in the batch calculation
+        self.assertEqual(self.sun.get_sunrise_time(date(2024, 3, 11)),
+                         self.sun.get_sunrise_times([date(2024, 3, 11)])[0])
+        self.assertEqual(self.sun.get_sun_timedelta(date(2024, 3, 11), timezone(timedelta(hours=-8))),
+                         timedelta(hours=6, minutes=25, seconds=48))
+
 
 class TestEastSun(unittest.TestCase):
 
@@ -65,6 +100,20 @@ class TestEastSun(unittest.TestCase):
         self.assertEqual(utc_sunrise, expected_sunrise)
 
 
+class TestFarWestEastTimeZoneSun(unittest.TestCase):
+    """ Test on a location west of the date line using a time zone ahead of UTC (i.e. Kiritimati, UTC+14) """
+
+    def setUp(self):
+        self.sun = Sun(_KIRITIMATI_LAT, _KIRITIMATI_LON)
+
+    def test_get_sunrise_sunset_time(self):
+        # Sunrise and sunset are shifted to the same day, so the daylight stays shorter than a day
+        time_zone = tz.gettz('Pacific/Kiritimati')
+        local_sunrise, local_sunset = self.sun.get_sunrise_sunset_time(datetime(2024, 3, 1), time_zone)
+        self.assertEqual(datetime(2024, 3, 2, 6, 39, 36, tzinfo=time_zone), local_sunrise)
+        self.assertEqual(datetime(2024, 3, 2, 18, 44, 24, tzinfo=time_zone), local_sunset)
+
+
 class TestSouthSun(unittest.TestCase):
     """ Test south hemisphere location where the sun rises and sets (i.e. Sydney)"""
 
@@ -83,6 +132,13 @@ class TestSouthSun(unittest.TestCase):
         local_sunset = self.sun.get_sunset_time(datetime(2024, 3, 11), tz.gettz('Australia/Sydney'))
         self.assertEqual(expected_sunset, local_sunset)
 
+    def test_get_sunrise_sunset_time(self):
+        # Sunrise and sunset in Sydney at once
+        local_sunrise, local_sunset = self.sun.get_sunrise_sunset_time(datetime(2024, 3, 11),
+                                                                       tz.gettz('Australia/Sydney'))
+        self.assertEqual(datetime(2024, 3, 11, 6, 51, 36, tzinfo=tz.gettz('Australia/Sydney')), local_sunrise)
+        self.assertEqual(datetime(2024, 3, 11, 19, 18, 0, tzinfo=tz.gettz('Australia/Sydney')), local_sunset)
+
 
 class TestNoSun(unittest.TestCase):
     """ Test on a location where the sun never rises or sets (i.e. North Pole) """
@@ -100,6 +156,77 @@ class TestNoSun(unittest.TestCase):
         with self.assertRaises(SunTimeException):
             self.sun.get_sunset_time(datetime(2024, 6, 21))  # Summer solstice in the northern hemisphere
 
+    def test_get_sunrise_sunset_time(self):
+        with self.assertRaises(SunTimeException):
+            self.sun.get_sunrise_sunset_time(datetime(2024, 12, 21))
+
+    def test_get_sun_times(self):
+        # Batch calculation marks the dates without sunrise or sunset
+        sunrises = self.sun.get_sunrise_times([datetime(2024, 12, 21), datetime(2024, 6, 21)])
+        self.assertEqual(sunrises, [None, None])
+        self.assertTrue(all(math.isnan(s) for s in self.sun.get_sunset_seconds([datetime(2024, 6, 21)])))
+
+
+class TestCacheSize(unittest.TestCase):
+    """ Test the cache size setting from the SUNTIME_CACHE_SIZE environment variable """
+
+    def test_cache_size(self):
+        with mock.patch.dict(os.environ, {'SUNTIME_CACHE_SIZE': '16'}):
+            self.assertEqual(_cache_size(), 16)
+        with mock.patch.dict(os.environ, {'SUNTIME_CACHE_SIZE': '0'}):
+            self.assertEqual(_cache_size(), 0)
+
+    @unittest.skipUnless(CACHE_SIZE, 'caching disabled with SUNTIME_CACHE_SIZE=0')
+    def test_cached_sun_time(self):
+        # Results are cached per location and day of the year, so the same day of another year is a cache hit, also
+        # for another Sun instance at the same location
+        _sun_ut.cache_clear()
+        sun = Sun(_SF_LAT, _SF_LON)
+        self.assertEqual(sun.get_sunrise_time(datetime(2024, 3, 11)), datetime(2024, 3, 11, 14, 25, 48, tzinfo=tz.UTC))
+        self.assertEqual(sun.get_sunrise_time(datetime(2023, 3, 12)), datetime(2023, 3, 12, 14, 25, 48, tzinfo=tz.UTC))
+        self.assertEqual(Sun(_SF_LAT, _SF_LON).get_sunrise_time(datetime(2023, 3, 12)),
+                         datetime(2023, 3, 12, 14, 25, 48, tzinfo=tz.UTC))
+        self.assertEqual(_sun_ut.cache_info().hits, 2)
+
+    def test_invalid_cache_size(self):
+        # Malformed or negative values fall back to the default instead of failing the import
+        for value in ('abc', '-1', ''):
+            with mock.patch.dict(os.environ, {'SUNTIME_CACHE_SIZE': value}):
+                with self.assertWarns(RuntimeWarning):
+                    self.assertEqual(_cache_size(), DEFAULT_CACHE_SIZE)
+
+
+class TestTimeZoneOffsetCache(unittest.TestCase):
+    """ Test the cached time zone offsets around a daylight saving time change (i.e. Warsaw) """
+
+    def setUp(self):
+        self.sun = Sun(_WARSAW_LAT, _WARSAW_LON)
+        self.time_zone = tz.gettz('Europe/Warsaw')
+        _utc_offsets.clear()
+
+    def test_same_instant_different_wall_time(self):
+        # Same UTC instant, but the wall clock is before and after the change to summer time
+        before = datetime(2024, 3, 31, 0, 30, tzinfo=timezone.utc)
+        after = datetime(2024, 3, 31, 3, 30, tzinfo=timezone(timedelta(hours=3)))
+        expected_before = datetime(2024, 3, 31, 5, 13, 12, tzinfo=self.time_zone)
+        expected_after = datetime(2024, 3, 31, 6, 13, 12, tzinfo=self.time_zone)
+        # Results do not depend on the call order
+        for _ in range(2):
+            self.assertEqual(self.sun.get_sunrise_time(before, self.time_zone), expected_before)
+            self.assertEqual(self.sun.get_sunrise_time(after, self.time_zone), expected_after)
+            _utc_offsets.clear()
+            self.assertEqual(self.sun.get_sunrise_time(after, self.time_zone), expected_after)
+            self.assertEqual(self.sun.get_sunrise_time(before, self.time_zone), expected_before)
+
+    def test_change_within_hour(self):
+        # St. John's changed to summer time at 00:01, so the offset differs within the same hour
+        sun = Sun(47.56, -52.7)
+        time_zone = tz.gettz('America/St_Johns')
+        self.assertEqual(sun.get_sunrise_time(datetime(2010, 3, 14, 0, 0), time_zone),
+                         datetime(2010, 3, 14, 6, 16, 48, tzinfo=time_zone))
+        self.assertEqual(sun.get_sunrise_time(datetime(2010, 3, 14, 0, 30), time_zone),
+                         datetime(2010, 3, 14, 7, 16, 48, tzinfo=time_zone))
+
 
 if __name__ == '__main__':
     unittest.main()